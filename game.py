@@ -9,17 +9,106 @@ def display_board(board):
     print(f" {board[6]} | {board[7]} | {board[8]} \n")
 
 
+WIN_CONDITIONS = [
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Rows
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Columns
+    [0, 4, 8], [2, 4, 6]              # Diagonals
+]
+
+# Bitboards: bit i is set when the player owns cell i
+FULL_MASK = 0b111111111
+WIN_MASKS = tuple(sum(1 << i for i in condition) for condition in WIN_CONDITIONS)
+
+# Lookup table: IS_WINNING[mask] is True if mask contains any winning line
+IS_WINNING = tuple(
+    any(mask & win == win for win in WIN_MASKS) for mask in range(FULL_MASK + 1)
+)
+
+# Center first, then corners, then sides: the best moves are usually searched first
+MOVE_ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+transposition_table = {}
+
+
+def board_to_mask(board, player):
+    """Returns the bitboard of cells owned by the player."""
+    mask = 0
+    for i, cell in enumerate(board):
+        if cell == player:
+            mask |= 1 << i
+    return mask
+
+
 def check_winner(board, player):
     """Checks if the player has won the game."""
-    win_conditions = [
-        [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Rows
-        [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Columns
-        [0, 4, 8], [2, 4, 6]              # Diagonals
-    ]
-    for condition in win_conditions:
-        if all(board[i] == player for i in condition):
-            return True
-    return False
+    return IS_WINNING[board_to_mask(board, player)]
+
+
+def negamax(me, opponent, alpha=-10, beta=10):
+    """
+    Scores the position for the side to move, whose cells are in `me`.
+    A win scores 1 + the number of cells still empty (faster wins score higher),
+    a loss the negative of that, and a draw 0.
+    """
+    key = (me, opponent)
+    entry = transposition_table.get(key)
+    if entry is not None:
+        flag, value = entry
+        if flag == EXACT:
+            return value
+        if flag == LOWER_BOUND:
+            alpha = max(alpha, value)
+        else:
+            beta = min(beta, value)
+        if alpha >= beta:
+            return value
+
+    occupied = me | opponent
+    if occupied == FULL_MASK:
+        return 0
+
+    original_alpha = alpha
+    empty_after_move = 8 - bin(occupied).count('1')
+    best = -10
+    for cell in MOVE_ORDER:
+        bit = 1 << cell
+        if occupied & bit:
+            continue
+        if IS_WINNING[me | bit]:
+            score = 1 + empty_after_move
+        else:
+            score = -negamax(opponent, me | bit, -beta, -alpha)
+        if score > best:
+            best = score
+            if best > alpha:
+                alpha = best
+                if alpha >= beta:
+                    break
+
+    if best <= original_alpha:
+        transposition_table[key] = (UPPER_BOUND, best)
+    elif best >= beta:
+        transposition_table[key] = (LOWER_BOUND, best)
+    else:
+        transposition_table[key] = (EXACT, best)
+    return best
+
+
+def best_move(me, opponent):
+    """Returns the cell index of a perfect move for the side owning `me`."""
+    occupied = me | opponent
+    move, alpha = None, -10
+    for cell in MOVE_ORDER:
+        bit = 1 << cell
+        if occupied & bit:
+            continue
+        if IS_WINNING[me | bit]:
+            return cell
+        score = -negamax(opponent, me | bit, -10, -alpha)
+        if move is None or score > alpha:
+            move, alpha = cell, score
+    return move
 
 
 def get_player_move(board):
@@ -34,30 +123,32 @@ def get_player_move(board):
             print("Invalid input. Enter a number between 1 and 9.")
 
 
-def bot_move(board):
+def bot_move(board, player='O'):
+    """Determines the bot's move with a full alpha-beta search of the game tree."""
+    opponent = 'X' if player == 'O' else 'O'
+    return best_move(board_to_mask(board, player), board_to_mask(board, opponent))
+
+
+def heuristic_bot_move(board, player='O'):
     """Determines the bot's move using a basic strategy."""
+    opponent = 'X' if player == 'O' else 'O'
+    me = board_to_mask(board, player)
+    them = board_to_mask(board, opponent)
+    empty = FULL_MASK & ~(me | them)
+
     # Play center if available
-    if board[4] == ' ':
+    if empty & (1 << 4):
         return 4
 
     # Check for possible winning moves or blocks
-    for player in ['O', 'X']:
+    for mask in (me, them):
         for i in range(9):
-            if board[i] == ' ':
-                board[i] = player
-                if check_winner(board, player):
-                    board[i] = ' '
-                    return i
-                board[i] = ' '
-
-    # Take any available corner
-    for i in [0, 2, 6, 8]:
-        if board[i] == ' ':
-            return i
+            if empty & (1 << i) and IS_WINNING[mask | (1 << i)]:
+                return i
 
-    # Take any available side
-    for i in [1, 3, 5, 7]:
-        if board[i] == ' ':
+    # Take any available corner, then any available side
+    for i in [0, 2, 6, 8, 1, 3, 5, 7]:
+        if empty & (1 << i):
             return i
 
 
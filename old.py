@@ -1,6 +1,9 @@
 import requests
 import json
 import os
+import stat
+import string
+import tempfile
 from typing import Optional
 from openai import OpenAI
 
@@ -65,6 +68,297 @@ def call_gpt_system(system_instructions: str, user_message: str, model: str):
         print(f"Error calling GPT system: {e}")
         return None
 
+def stream_gpt_system(system_instructions: str, user_message: str, model: str):
+    """
+    Streaming variant of call_gpt_system: yields content deltas as they arrive.
+    Closing the generator early also closes the underlying HTTP response.
+    """
+    client = OpenAI()
+    stream = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system_instructions},
+            {"role": "user", "content": user_message},
+        ],
+        temperature=0.7,
+        stream=True,
+    )
+    try:
+        for chunk in stream:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+    finally:
+        stream.close()
+
+###############################################################################
+#  Step 3.5: Incremental JSON Parsing
+#     - The code-generation answer is a flat JSON object, so we parse it while
+#       it streams and hand each field to a callback as soon as it is decoded.
+###############################################################################
+CODE_SOLUTION_KEYS = ['explanation', 'code', 'installation']
+CODE_GEN_MAX_ATTEMPTS = 3
+
+
+class StreamingJSONError(ValueError):
+    """Raised as soon as the streamed JSON can no longer be valid."""
+
+
+class StreamingJSONFieldParser:
+    """
+    Incrementally parses a flat JSON object fed in arbitrary chunks.
+
+    String values are decoded and passed to on_field_data(key, text) piece by
+    piece, so they can be streamed elsewhere without buffering the payload.
+    Non-string values are passed once, already decoded. The object starts at
+    the first '{' after a ```json fence, or failing that the first '{' at the
+    start of a line; prose before it and anything after the closing brace is
+    ignored.
+    """
+    _ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b',
+                'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+    _WHITESPACE = ' \t\r\n'
+    _FENCE = '```json'
+    _MAX_PREAMBLE = 4000
+
+    def __init__(self, on_field_start=None, on_field_data=None, on_field_end=None):
+        self._on_field_start = on_field_start or (lambda key: None)
+        self._on_field_data = on_field_data or (lambda key, data: None)
+        self._on_field_end = on_field_end or (lambda key: None)
+        self._state = 'preamble'
+        self._preamble_length = 0
+        self._preamble_tail = ''
+        self._at_line_start = True
+        self._after_fence = False
+        self._key = None
+        self._in_key = False
+        self._key_parts = []
+        self._escape = None
+        self._high_surrogate = None
+        self._raw_parts = []
+        self._raw_depth = 0
+        self._raw_in_string = False
+        self._raw_escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == 'done'
+
+    def feed(self, chunk: str):
+        """Consumes the next piece of the stream, firing callbacks as fields complete."""
+        i = 0
+        n = len(chunk)
+        while i < n:
+            if self._state == 'string':
+                i = self._feed_string(chunk, i, n)
+            elif self._state == 'raw':
+                i = self._feed_raw(chunk, i, n)
+            else:
+                self._feed_structural(chunk[i])
+                i += 1
+
+    def close(self):
+        """Signals end of stream; raises if the object was never completed."""
+        if self._state == 'raw' and self._raw_depth == 0 and not self._raw_in_string:
+            self._finish_raw()
+        if self._state != 'done':
+            raise StreamingJSONError("Stream ended before the JSON object was complete")
+
+    def _fail(self, message: str):
+        raise StreamingJSONError(message)
+
+    def _feed_structural(self, c: str):
+        state = self._state
+        if state == 'done':
+            return
+        if state == 'preamble':
+            self._feed_preamble(c)
+            return
+        if c in self._WHITESPACE:
+            return
+        if state in ('object_start', 'key') and c == '"':
+            self._in_key = True
+            self._state = 'string'
+        elif state == 'object_start' and c == '}':
+            self._state = 'done'
+        elif state == 'colon' and c == ':':
+            self._state = 'value'
+        elif state == 'value' and c == '"':
+            self._in_key = False
+            self._on_field_start(self._key)
+            self._state = 'string'
+        elif state == 'value' and c in '{[-0123456789tfn':
+            self._on_field_start(self._key)
+            self._state = 'raw'
+            self._feed_raw(c, 0, 1)
+        elif state == 'after_value' and c == ',':
+            self._state = 'key'
+        elif state == 'after_value' and c == '}':
+            self._state = 'done'
+        else:
+            self._fail(f"Unexpected {c!r} while expecting {state.replace('_', ' ')}")
+
+    def _feed_preamble(self, c: str):
+        if c == '{' and (self._after_fence or self._at_line_start):
+            self._state = 'object_start'
+            return
+        if self._after_fence and c not in self._WHITESPACE:
+            self._fail(f"Unexpected {c!r} after {self._FENCE} fence")
+
+        self._preamble_length += 1
+        if self._preamble_length > self._MAX_PREAMBLE:
+            self._fail("No JSON object found at the start of the response")
+
+        # A '{' in the middle of a prose line is not the start of the answer
+        if c == '\n':
+            self._at_line_start = True
+        elif c not in ' \t':
+            self._at_line_start = False
+        self._preamble_tail = (self._preamble_tail + c)[-len(self._FENCE):]
+        if self._preamble_tail == self._FENCE:
+            self._after_fence = True
+
+    def _emit(self, text: str):
+        if self._high_surrogate is not None:
+            self._fail("Unpaired surrogate in \\u escape")
+        if self._in_key:
+            self._key_parts.append(text)
+        else:
+            self._on_field_data(self._key, text)
+
+    def _feed_string(self, chunk: str, i: int, n: int) -> int:
+        if self._escape is not None:
+            return self._feed_escape(chunk, i)
+
+        # Hand over the whole run up to the next quote or backslash in one go
+        quote = chunk.find('"', i)
+        backslash = chunk.find('\\', i, quote if quote != -1 else n)
+        j = backslash if backslash != -1 else quote
+        if j == -1:
+            self._emit(chunk[i:])
+            return n
+        if j > i:
+            self._emit(chunk[i:j])
+        if j == backslash:
+            self._escape = ''
+        else:
+            self._end_string()
+        return j + 1
+
+    def _feed_escape(self, chunk: str, i: int) -> int:
+        c = chunk[i]
+        if self._escape == '':
+            if c == 'u':
+                self._escape = 'u'
+            elif c in self._ESCAPES:
+                self._escape = None
+                self._emit(self._ESCAPES[c])
+            else:
+                self._fail(f"Invalid escape sequence '\\{c}'")
+            return i + 1
+
+        if c not in string.hexdigits:
+            self._fail(f"Invalid escape sequence '\\{self._escape}{c}'")
+        self._escape += c
+        if len(self._escape) < 5:
+            return i + 1
+        code = int(self._escape[1:], 16)
+        self._escape = None
+
+        if self._high_surrogate is not None:
+            if not 0xDC00 <= code <= 0xDFFF:
+                self._fail("Unpaired surrogate in \\u escape")
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+            self._high_surrogate = None
+        elif 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return i + 1
+        self._emit(chr(code))
+        return i + 1
+
+    def _end_string(self):
+        if self._high_surrogate is not None:
+            self._fail("Unpaired surrogate in \\u escape")
+        if self._in_key:
+            self._key = ''.join(self._key_parts)
+            self._key_parts = []
+            self._state = 'colon'
+        else:
+            self._on_field_end(self._key)
+            self._state = 'after_value'
+
+    def _feed_raw(self, chunk: str, i: int, n: int) -> int:
+        # Non-string values are small, so we just find where they end and let json decode them
+        start = i
+        while i < n:
+            c = chunk[i]
+            if self._raw_in_string:
+                if self._raw_escape:
+                    self._raw_escape = False
+                elif c == '\\':
+                    self._raw_escape = True
+                elif c == '"':
+                    self._raw_in_string = False
+            elif c == '"':
+                self._raw_in_string = True
+            elif c in '{[':
+                self._raw_depth += 1
+            elif c in '}]':
+                if self._raw_depth == 0:
+                    break
+                self._raw_depth -= 1
+            elif c == ',' and self._raw_depth == 0:
+                break
+            i += 1
+        self._raw_parts.append(chunk[start:i])
+        if i < n:
+            self._finish_raw()
+        return i
+
+    def _finish_raw(self):
+        raw = ''.join(self._raw_parts)
+        self._raw_parts = []
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self._fail(f"Invalid value for '{self._key}': {e}")
+        self._on_field_data(self._key, value)
+        self._on_field_end(self._key)
+        self._state = 'after_value'
+
+
+class StrippedFileWriter:
+    """
+    Writes streamed text to an open text file, dropping leading and trailing
+    whitespace the same way str.strip() would on the complete text.
+    """
+
+    def __init__(self, file):
+        self._file = file
+        self._started = False
+        self._pending = ''
+
+    def write(self, text: str):
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return
+            self._started = True
+        # Hold back trailing whitespace until we know more text follows it
+        end = len(text.rstrip())
+        if end == 0:
+            self._pending += text
+            return
+        if self._pending:
+            self._file.write(self._pending)
+        self._file.write(text[:end] if end < len(text) else text)
+        self._pending = text[end:]
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
 ###############################################################################
 #  Step 4: Orchestrating Function
 ###############################################################################
@@ -159,64 +453,115 @@ def multi_step_orchestration(high_level_prompt: str):
         "You are an AI that generates code solutions. For installation - example: pip install ... Return a JSON with keys "
         "'explanation', 'code', 'installation'."
     )
-    code_solution_json_str = call_gpt_system(system_msg_code, final_plan, model="gpt-4o")
-    if not code_solution_json_str:
-        print("⚠️ Failed to generate code solution.")
-        return {"error": "Failed to generate code solution."}
+    return stream_code_solution(system_msg_code, final_plan, model="gpt-4o")
 
-    # Log the raw response before attempting to parse
-    print("\n💾 Logging raw GPT response...")
-    with open('gpt_response.txt', 'w', encoding='utf-8') as f:
-        f.write(code_solution_json_str)
 
-    # Attempt to parse JSON with better error handling
+def file_mode_for(path: str) -> int:
+    """
+    Returns the permission bits a file written to path should get: those of
+    the existing file, or what open() would use for a new one under the umask.
+    """
     try:
-        # First, find and extract just the JSON content
-        json_start = code_solution_json_str.find('```json')
-        if json_start != -1:
-            # Remove everything before ```json
-            code_solution_json_str = code_solution_json_str[json_start + 7:]
-            
-            # Remove everything after the next ```
-            json_end = code_solution_json_str.find('```')
-            if json_end != -1:
-                code_solution_json_str = code_solution_json_str[:json_end]
-        
-        code_solution = json.loads(code_solution_json_str.strip())
-        
-        if not isinstance(code_solution, dict):
-            raise ValueError("Parsed JSON is not a dictionary")
-        
-        required_keys = ['explanation', 'code', 'installation']
-        if not all(key in code_solution for key in required_keys):
-            raise ValueError(f"Missing required keys. Expected: {required_keys}")
-            
-    except (json.JSONDecodeError, ValueError) as e:
-        print(f"⚠️ Error parsing JSON: {e}")
-        print("📝 Raw response has been saved to 'gpt_response.txt'")
-        return {
-            "error": "JSON parsing failed",
-            "raw_content": code_solution_json_str
-        }
-
-    # If parsing succeeded, write the code to ai.py
-    if 'code' in code_solution:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def stream_code_solution(system_msg: str, user_message: str, model: str,
+                         code_path: str = 'ai.py', log_path: str = 'gpt_response.txt',
+                         max_attempts: int = CODE_GEN_MAX_ATTEMPTS):
+    """
+    Streams the code-generation call and parses its JSON answer as it arrives.
+    The 'code' field is written to a temp file next to code_path while the model
+    is still generating, and only replaces code_path once the whole answer is
+    valid. Malformed output aborts the stream and starts a fresh attempt.
+    """
+    last_error = None
+    for attempt in range(1, max_attempts + 1):
+        if attempt > 1:
+            print(f"\n🔁 Retrying code generation (attempt {attempt}/{max_attempts})...")
+
+        fields = {}
+        parts = {}
+        code_writer = None
+        temp_path = None
+
+        def on_field_start(key):
+            nonlocal code_writer, temp_path
+            print(f"  • Receiving '{key}'...")
+            if key == 'code':
+                if code_writer is not None:
+                    raise StreamingJSONError("Duplicate 'code' key")
+                temp_file = tempfile.NamedTemporaryFile(
+                    'w', encoding='utf-8', dir=os.path.dirname(os.path.abspath(code_path)),
+                    prefix='.ai-', suffix='.partial', delete=False,
+                )
+                temp_path = temp_file.name
+                code_writer = StrippedFileWriter(temp_file)
+            else:
+                parts[key] = []
+
+        def on_field_data(key, data):
+            if key == 'code':
+                if not isinstance(data, str):
+                    raise StreamingJSONError("'code' must be a JSON string")
+                code_writer.write(data)
+            elif isinstance(data, str):
+                parts[key].append(data)
+            else:
+                fields[key] = data
+
+        def on_field_end(key):
+            if key == 'code':
+                code_writer.close()
+                fields['code_file'] = code_path
+            elif key not in fields:
+                fields[key] = ''.join(parts.pop(key))
+
+        parser = StreamingJSONFieldParser(on_field_start, on_field_data, on_field_end)
+        stream = stream_gpt_system(system_msg, user_message, model)
         try:
-            # Clean and format the code before writing
-            clean_code = (code_solution['code']
-                .replace('\\n', '\n')  # Replace escaped newlines
-                .replace('\"', '"')    # Replace escaped quotes
-                .strip()               # Remove leading/trailing whitespace
-            )
-            
-            # Write the cleaned code
-            with open('ai.py', 'w', encoding='utf-8') as f:
-                f.write(clean_code)
-            print("✅ Successfully wrote code to ai.py")
+            # Log the raw response as it streams in, for debugging failed parses.
+            # Retries append to the same file so earlier attempts are kept.
+            with open(log_path, 'w' if attempt == 1 else 'a', encoding='utf-8') as log:
+                if attempt > 1:
+                    log.write(f"\n\n===== Attempt {attempt}/{max_attempts} =====\n")
+                for delta in stream:
+                    log.write(delta)
+                    parser.feed(delta)
+            parser.close()
+
+            missing = [key for key in CODE_SOLUTION_KEYS if key not in fields and key != 'code']
+            if 'code_file' not in fields:
+                missing.append('code')
+            if missing:
+                raise StreamingJSONError(f"Missing required keys: {missing}")
+
+            # NamedTemporaryFile is always 0600; keep ai.py's permissions as open() would
+            os.chmod(temp_path, file_mode_for(code_path))
+            os.replace(temp_path, code_path)
+            temp_path = None
+            print(f"✅ Successfully streamed code to {code_path}")
+            return fields
+        except StreamingJSONError as e:
+            print(f"⚠️ Error parsing streamed JSON: {e}")
+            print(f"📝 Raw response (attempt {attempt}) has been saved to '{log_path}'")
+            last_error = e
         except Exception as e:
-            print(f"⚠️ Error writing to ai.py: {e}")
+            # API, auth and I/O errors won't be fixed by generating again
+            print(f"⚠️ Error streaming code solution: {e}")
+            return {"error": "Failed to generate code solution.", "details": str(e)}
+        finally:
+            stream.close()
+            if code_writer is not None:
+                code_writer.close()
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
 
-    return code_solution
+    print("⚠️ Failed to generate code solution.")
+    return {"error": "JSON parsing failed", "details": str(last_error)}
 
 ###############################################################################
 #  Step 5: Entry Point
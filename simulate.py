@@ -0,0 +1,189 @@
+# Headless batch self-play for game.py bots
+# pip install numpy
+#
+# Example: python simulate.py --x search --o random --games 20000 --workers 4
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import game
+
+EMPTY, X, O = 0, 1, 2
+SYMBOLS = np.array([' ', 'X', 'O'])
+
+
+###############################################################################
+#  Win Detection
+#     - Boards are a (games, n, n) int8 array: 0 empty, 1 X, 2 O.
+#     - A k-in-a-row line is found by AND-ing k shifted copies of the
+#       player's occupancy grid, once per direction, for every board at once.
+###############################################################################
+def batch_has_won(boards: np.ndarray, player: int, k: int) -> np.ndarray:
+    """
+    Returns a (games,) bool array: True where the player has k in a row.
+    """
+    occupied = boards == player
+    n = boards.shape[-1]
+    m = n - k + 1
+    if m < 1:
+        return np.zeros(boards.shape[0], dtype=bool)
+
+    rows = occupied[:, :, :m].copy()
+    cols = occupied[:, :m, :].copy()
+    diagonals = occupied[:, :m, :m].copy()
+    anti_diagonals = occupied[:, :m, k - 1:].copy()
+    for i in range(1, k):
+        rows &= occupied[:, :, i:i + m]
+        cols &= occupied[:, i:i + m, :]
+        diagonals &= occupied[:, i:i + m, i:i + m]
+        anti_diagonals &= occupied[:, i:i + m, k - 1 - i:k - 1 - i + m]
+
+    return (
+        rows.any(axis=(1, 2))
+        | cols.any(axis=(1, 2))
+        | diagonals.any(axis=(1, 2))
+        | anti_diagonals.any(axis=(1, 2))
+    )
+
+
+###############################################################################
+#  Policies
+#     - policy(boards, player, n, k, rng) -> (games,) array of flat cell indices.
+#     - boards is (games, n * n); every board passed in has an empty cell.
+###############################################################################
+def random_policy(boards, player, n, k, rng):
+    """Picks a uniformly random empty cell on every board."""
+    scores = rng.random(boards.shape)
+    scores[boards != EMPTY] = -1.0
+    return scores.argmax(axis=1)
+
+
+def heuristic_policy(boards, player, n, k, rng):
+    """Plays game.heuristic_bot_move (3x3 only)."""
+    symbol = str(SYMBOLS[player])
+    return np.array(
+        [game.heuristic_bot_move(SYMBOLS[row].tolist(), symbol) for row in boards], dtype=np.intp
+    )
+
+
+def search_policy(boards, player, n, k, rng):
+    """Plays game.best_move, the perfect alpha-beta bot (3x3 only)."""
+    # Bitboards for every game at once: bit i is set when the player owns cell i
+    weights = 1 << np.arange(n * n)
+    mine = (boards == player) @ weights
+    theirs = (boards == (X + O - player)) @ weights
+    return np.array(
+        [game.best_move(int(me), int(opponent)) for me, opponent in zip(mine, theirs)], dtype=np.intp
+    )
+
+
+POLICIES = {
+    'random': random_policy,
+    'heuristic': heuristic_policy,
+    'search': search_policy,
+}
+
+# Policies built on game.py only understand classic tic-tac-toe
+CLASSIC_ONLY = {'heuristic', 'search'}
+
+
+###############################################################################
+#  Simulation
+###############################################################################
+def play_batch(x_policy: str, o_policy: str, games: int, n: int = 3, k: int = 3, seed=None) -> np.ndarray:
+    """
+    Plays `games` games in lockstep and returns a (games,) array of winners:
+    1 for X, 2 for O, 0 for a draw.
+    """
+    rng = np.random.default_rng(seed)
+    policies = {X: POLICIES[x_policy], O: POLICIES[o_policy]}
+    boards = np.zeros((games, n * n), dtype=np.int8)
+    winners = np.zeros(games, dtype=np.int8)
+    active = np.arange(games)
+
+    player = X
+    for _ in range(n * n):
+        moves = policies[player](boards[active], player, n, k, rng)
+        boards[active, moves] = player
+
+        # Only the player who just moved can have completed a line
+        won = batch_has_won(boards[active].reshape(-1, n, n), player, k)
+        winners[active[won]] = player
+        active = active[~won]
+        if active.size == 0:
+            break
+        player = O if player == X else X
+
+    return winners
+
+
+def _play_batch_job(args):
+    return play_batch(*args)
+
+
+def run_simulation(x_policy: str, o_policy: str, games: int, n: int = 3, k: int = 3,
+                   batch_size: int = 5000, workers=None, seed=None):
+    """
+    Splits `games` into batches, plays them across worker processes and
+    returns the tally along with the throughput in games per second.
+    """
+    for name in (x_policy, o_policy):
+        if name not in POLICIES:
+            raise ValueError(f"Unknown policy '{name}'. Choose from: {sorted(POLICIES)}")
+        if name in CLASSIC_ONLY and (n, k) != (3, 3):
+            raise ValueError(f"Policy '{name}' only supports a 3x3 board with k=3")
+    if not 1 <= k <= n:
+        raise ValueError("k must be between 1 and the board size")
+    if games < 1:
+        raise ValueError("games must be at least 1")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    sizes = [batch_size] * (games // batch_size)
+    if games % batch_size:
+        sizes.append(games % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(x_policy, o_policy, size, n, k, batch_seed) for size, batch_seed in zip(sizes, seeds)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        winners = np.concatenate(list(executor.map(_play_batch_job, jobs)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "games": games,
+        "x_wins": int((winners == X).sum()),
+        "o_wins": int((winners == O).sum()),
+        "draws": int((winners == EMPTY).sum()),
+        "seconds": elapsed,
+        "games_per_second": games / elapsed if elapsed else float('inf'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch self-play between game.py bots.")
+    parser.add_argument('--x', default='search', choices=sorted(POLICIES), help="policy playing X (moves first)")
+    parser.add_argument('--o', default='random', choices=sorted(POLICIES), help="policy playing O")
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--size', type=int, default=3, help="board is size x size")
+    parser.add_argument('--k', type=int, default=3, help="marks in a row needed to win")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    result = run_simulation(args.x, args.o, args.games, args.size, args.k,
+                            args.batch_size, args.workers, args.seed)
+
+    print(f"\n=== {args.x} (X) vs {args.o} (O) on {args.size}x{args.size}, {args.k} in a row ===")
+    print(f"X wins: {result['x_wins']}")
+    print(f"O wins: {result['o_wins']}")
+    print(f"Draws:  {result['draws']}")
+    print(f"{result['games']} games in {result['seconds']:.2f}s ({result['games_per_second']:.0f} games/s)")
+
+
+if __name__ == "__main__":
+    main()